@@ -54,6 +54,9 @@ CACHES = {
         'LOCATION': '127.0.0.1:11211',
     }
 }
+# Every view reads the user_id out of the session, serve those reads
+# from memcached and only fall back to the database on a miss.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 
 # Django debug tool bar settings
 DEBUG_TOOLBAR_PANELS = (
@@ -109,6 +112,15 @@ TEMPLATE_LOADERS = (
     'django.template.loaders.app_directories.Loader',
 #     'django.template.loaders.eggs.Loader',
 )
+# DEBUG is on in this file so the block below does nothing here, it
+# takes effect once DEBUG is turned off for a deployment based on it.
+if not DEBUG:
+    # keep the compiled templates in memory rather than loading and
+    # parsing them again on every render, at the cost of needing a
+    # restart to pick up template changes.
+    TEMPLATE_LOADERS = (
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    )
 TEMPLATE_CONTEXT_PROCESSORS = (
     "django.contrib.auth.context_processors.auth",
     "django.core.context_processors.debug",
@@ -111,6 +111,8 @@ def ot_by_month(request, year=None, month=None): # pragma: no cover
     :param month: The month for the report.
 
     :note: Both year and mont are required.'''
+    if not 0 < int(month) <= len(MONTH_MAP):
+        raise Http404
     auth_user = Tbluser.objects.get(id=request.session.get("user_id"))
     buf = StringIO()
     buf.write("\xef\xbb\xbf")
@@ -138,7 +140,7 @@ def ot_by_year(request, year=None): # pragma: no cover
     buf.write("\xef\xbb\xbf")
     csvfile = UnicodeWriter(buf)
     csvfile.writerow(
-        ["Name", "Team"] + [MONTH_MAP[n][1] for n in range(0,12)]
+        ["Name", "Team"] + [month_name for _, month_name in MONTH_MAP]
         )
     total_balance = 0
     balances = {
@@ -172,7 +174,7 @@ def holidays_for_yearmonth(request, year=None): # pragma: no cover
     buf.write("\xef\xbb\xbf")
     csvfile = UnicodeWriter(buf)
     csvfile.writerow(
-        ["Name"] + [MONTH_MAP[n][1] for n in range(0,12)] + ["Used", "Remaining"]
+        ["Name"] + [month_name for _, month_name in MONTH_MAP] + ["Used", "Remaining"]
         )
     for user in auth_user.get_subordinates():
         row = [user.name()]
@@ -14,6 +14,7 @@ import datetime as dt
 from operator import add
 
 from django.db import models
+from django.db.models import Count
 from django.forms import ModelForm
 from django.conf import settings
 from django.core.mail import EmailMessage, send_mail
@@ -74,6 +75,18 @@ except ImportError: # pragma: no cover
 
 from timetracker.loggers import debug_log
 
+# body of the e-mail sent by Tbluser.send_password_reminder
+PASSWORD_REMINDER_EMAIL = \
+    u"Hi {name},\n\n" \
+    "Your password has been reset to: {password}\n\n" \
+    "Regards,\n" \
+    "Timetracker team"
+
+# how long, in seconds, Tbluser.get_total_balance keeps a balance. Changing
+# a user's shiftlength, breaklength or market only clears the current
+# periods, older years and months are recalculated once this runs out.
+BALANCE_CACHE_TIMEOUT = 300
+
 
 class Tbluser(models.Model):
 
@@ -211,6 +224,21 @@ class Tbluser(models.Model):
                                 self.firstname,
                                 self.lastname)
 
+    def invalidate_caches(self):
+        '''Removes the cached copies of this user so that the next lookup
+        goes to the database. This is called on every save and delete, see
+        :func:`invalidate_user_caches`.'''
+        cache.delete("user:%s" % self.id)
+        # the balance depends on the shiftlength and market, clear the
+        # periods which are on display. Older periods are only kept for
+        # BALANCE_CACHE_TIMEOUT.
+        today = dt.date.today()
+        cache.delete_many([
+            "balance:%s%s%s" % (self.id, None, None),
+            "balance:%s%s%s" % (self.id, today.year, None),
+            "balance:%s%s%s" % (self.id, today.year, today.month),
+            ])
+
     def validate_password(self, string):
         '''We return whether our password matches the one we're supplied.
 
@@ -234,23 +262,17 @@ class Tbluser(models.Model):
         self.save()
 
     def send_password_reminder(self):
-        password = self.set_random_password()
-        email_message = \
-            u"Hi {name},\n\n" \
-            "Your password has been reset to: {password}\n\n" \
-            "Regards,\n" \
-            "Timetracker team"
-
-        email_message = email_message.format(**{
-                'name': self.firstname,
-                'password': password
-                })
-
+        password = get_random_string(12)
+        # the new password is only stored once the e-mail has gone out, if
+        # sending fails the old one still works.
         send_mail('You recently requested a password reminder',
-                  email_message,
+                  PASSWORD_REMINDER_EMAIL.format(name=self.firstname,
+                                                 password=password),
                   'timetracker@unmonitored.com',
                   [self.user_id], fail_silently=False
         )
+        self.update_password(password)
+        self.save()
 
     def isdisabled(self):
         '''Returns whether this user is disabled or not'''
@@ -304,23 +326,29 @@ class Tbluser(models.Model):
                     admin = self.get_administrator()
                 else:
                     admin = self
-                # find the subordinates and the related users
-                if get_all:
-                    result = Tblauthorization.objects.get(
-                        admin=admin
-                        ).users.all()
-                else:
-                    result = Tblauthorization.objects.get(
-                        admin=admin
-                        ).users.filter(disabled=False)
-                try:
-                    extra = RelatedUsers.objects.get(
-                        admin=admin
-                        ).users.filter(disabled=False)
-                except RelatedUsers.DoesNotExist:
-                    extra = []
-
-                ids = [user.id for user in result] + [user.id for user in extra]
+                # the team only changes when users are added, edited or
+                # removed so the ids are cached, see invalidate_subordinates.
+                cachestr = "subordinates:%s%s" % (admin.id, get_all)
+                ids = cache.get(cachestr)
+                if ids is None:
+                    # find the subordinates and the related users
+                    if get_all:
+                        result = Tblauthorization.objects.get(
+                            admin=admin
+                            ).users.all()
+                    else:
+                        result = Tblauthorization.objects.get(
+                            admin=admin
+                            ).users.filter(disabled=False)
+                    ids = list(result.values_list("id", flat=True))
+                    try:
+                        ids.extend(RelatedUsers.objects.get(
+                            admin=admin
+                            ).users.filter(disabled=False).values_list(
+                                "id", flat=True))
+                    except RelatedUsers.DoesNotExist:
+                        pass
+                    cache.set(cachestr, ids)
                 # find whether we need to append this user to it.
                 if self != admin or self.super_or_admin():
                     ids.append(admin.id)
@@ -328,6 +356,14 @@ class Tbluser(models.Model):
         except Tblauthorization.DoesNotExist:
             return Tbluser.objects.none()
 
+    def invalidate_subordinates(self):
+        '''Removes the cached team used by :meth:`get_subordinates` for this
+        user's manager. This should be called whenever a member of the team is
+        added, changed or removed.'''
+        admin = self.get_administrator()
+        cache.delete_many(["subordinates:%s%s" % (admin.id, get_all)
+                           for get_all in (True, False)])
+
     def get_administrator(self):
 
         '''Returns the :class:`Tbluser` who is this instances Authorization
@@ -342,7 +378,10 @@ class Tbluser(models.Model):
             return self
 
         try:
-            auth_links = Tblauthorization.objects.all().filter(users=self)
+            # the admin is read off every link, fetch them in the same query
+            auth_links = Tblauthorization.objects.filter(
+                users=self
+                ).select_related("admin")
             if len(auth_links) == 1:
                 return auth_links[0].admin
             if len(auth_links) == 2:
@@ -434,7 +473,7 @@ class Tbluser(models.Model):
         for entry in entries:
             if entry.comments:
                 comment_string = map(unicode, [entry.entry_date,
-                                               entry.user.name(),
+                                               self.name(),
                                                entry.comments])
                 comments_list.append(' '.join(comment_string))
         return comments_list
@@ -636,9 +675,9 @@ class Tbluser(models.Model):
         cached_result = cache.get(cachestr)
         if cached_result: # pragma: no cover
             return int(cached_result)
-        result = len(TrackingEntry.objects.filter(user_id=self.id,
-                                            entry_date__year=year,
-                                            daytype=daytype))
+        result = TrackingEntry.objects.filter(user_id=self.id,
+                                              entry_date__year=year,
+                                              daytype=daytype).count()
         cache.set(cachestr, str(result))
         return result
 
@@ -653,9 +692,27 @@ class Tbluser(models.Model):
         Get balances will return a dictionary of long daytype names
         against their balances.
         '''
+        # these share their cache entries with get_num_daytype_in_year, if
+        # any of them are missing all the daytypes are counted in one go
+        # rather than issuing a query per daytype.
+        cachestrs = {
+            daytype: "numdaytype:%s%s%s" % (self.id, year, daytype)
+                for daytype, _ in DAYTYPE_CHOICES
+            }
+        cached = cache.get_many(cachestrs.values())
+        if len(cached) == len(cachestrs):
+            counts = {daytype: int(cached[cachestr])
+                      for daytype, cachestr in cachestrs.items()}
+        else:
+            counts = dict.fromkeys(cachestrs, 0)
+            counts.update(TrackingEntry.objects.filter(
+                user_id=self.id,
+                entry_date__year=year
+                ).order_by().values_list("daytype").annotate(Count("id")))
+            cache.set_many({cachestr: str(counts[daytype])
+                            for daytype, cachestr in cachestrs.items()})
         daytype_dict = {
-            daytype[1]: self.get_num_daytype_in_year(year, daytype[0]) \
-                for daytype in DAYTYPE_CHOICES
+            daytype[1]: counts[daytype[0]] for daytype in DAYTYPE_CHOICES
             }
         daytype_dict.update({
             "Calculated Holidays": self.get_holiday_balance(year)
@@ -770,14 +827,31 @@ class Tbluser(models.Model):
                                                        entry_date__range=[from_,to_]
                                                        )
 
-        if settings.OVERRIDE_CALCULATION.get(self.market):
-            trackingnumber = \
-                settings.OVERRIDE_CALCULATION[self.market](self,
-                                                           tracking_days,
-                                                           return_days)
-        else:
-            trackingnumber = \
-                self._regular_calculation(tracking_days, return_days)
+        # the total, yearly and monthly balances are shown on most pages so
+        # they're cached until an entry in that period changes, see
+        # TrackingEntry.invalidate_caches. Arbitrary ranges aren't cached.
+        cachestr = None
+        if not (from_ and to_):
+            cachestr = "balance:%s%s%s" % (self.id,
+                                           year and int(year),
+                                           month and int(month))
+        trackingnumber = cachestr and cache.get(cachestr)
+        if trackingnumber is None:
+            if settings.OVERRIDE_CALCULATION.get(self.market):
+                # override calculations such as hr_calculation read the
+                # user's break length off each entry, join the user rather
+                # than fetching it once per entry.
+                trackingnumber = \
+                    settings.OVERRIDE_CALCULATION[self.market](
+                        self,
+                        tracking_days.select_related("user"),
+                        return_days
+                        )
+            else:
+                trackingnumber = \
+                    self._regular_calculation(tracking_days, return_days)
+            if cachestr:
+                cache.set(cachestr, trackingnumber, BALANCE_CACHE_TIMEOUT)
 
         if ret == 'html':
             tracker_class_map = {
@@ -1227,3 +1301,50 @@ class Tblauthorization(models.Model):
 
     display_users.allow_tags = True
     display_users.short_discription = "Subordinate Users"
+
+
+def invalidate_user_caches(sender, instance, **kwargs):
+    '''Clears the cached copies of a user whenever it's saved or deleted.
+
+    Signals are used rather than overriding save and delete because deletes
+    through a QuerySet, such as the admin's delete action, don't call the
+    instance's delete method but do send post_delete for each object.
+    '''
+    instance.invalidate_caches()
+
+models.signals.post_save.connect(invalidate_user_caches, sender=Tbluser)
+models.signals.post_delete.connect(invalidate_user_caches, sender=Tbluser)
+
+def invalidate_subordinates_on_change(sender, instance, action, reverse,
+                                      model, pk_set, **kwargs):
+    '''Keeps the ids cached by :meth:`Tbluser.get_subordinates` in line with
+    the team links, however they are changed.
+
+    When the change is made from the user's side the links named in pk_set
+    tell us whose teams changed. A clear doesn't name them, so they're noted
+    on the user before the links are removed.
+    '''
+    if not reverse:
+        admin_ids = [instance.admin_id]
+    elif action == "pre_clear":
+        instance._team_admin_ids = list(
+            model.objects.filter(users=instance).values_list("admin_id",
+                                                             flat=True)
+            )
+        return
+    elif action == "post_clear":
+        admin_ids = instance.__dict__.pop("_team_admin_ids", [])
+    else:
+        admin_ids = model.objects.filter(pk__in=pk_set or []).values_list(
+            "admin_id", flat=True
+            )
+    if not action.startswith("post_"):
+        return
+    cache.delete_many(["subordinates:%s%s" % (admin_id, get_all)
+                       for admin_id in admin_ids
+                       for get_all in (True, False)])
+
+models.signals.m2m_changed.connect(invalidate_subordinates_on_change,
+                                   sender=Tblauthorization.users.through)
+models.signals.m2m_changed.connect(invalidate_subordinates_on_change,
+                                   sender=RelatedUsers.users.through)
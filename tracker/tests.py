@@ -12,12 +12,14 @@ import simplejson
 import random
 import functools
 import time
+import socket
 from unittest import skipUnless
 
 from django.db import IntegrityError
 from django.test import TestCase, LiveServerTestCase
 from django.test.client import Client
 from django.core import mail
+from django.core.mail import send_mail
 from django.http import HttpResponse, Http404
 from django.conf import settings
 from django.test.utils import override_settings
@@ -39,9 +41,13 @@ from timetracker.utils.calendar_utils import (validate_time, parse_time,
                                               ajax_add_holiday)
 
 from timetracker.utils.datemaps import (pad, float_to_time,
-                                        generate_select, ABSENT_CHOICES,
-                                        MARKET_CHOICES)
+                                        generate_select, generate_month_box,
+                                        generate_employee_box,
+                                        invalidate_employee_box,
+                                        ABSENT_CHOICES, MARKET_CHOICES,
+                                        MONTH_MAP_SHORT)
 from timetracker.utils.error_codes import DUPLICATE_ENTRY
+from timetracker.utils.user_cache import get_cached_user, get_session_user
 from timetracker.tests.basetests import create_users, delete_users
 from timetracker.tests.basetests import login as login_user
 from timetracker.overtime.models import PendingApproval
@@ -290,6 +296,33 @@ class UserTestCase(BaseUserTest):
         auth.users.add(user)
         self.assertEquals(self.linked_manager.get_subordinates(get_all=all).count(), count)
 
+    def test_get_subordinates_cache_invalidated(self):
+        count = self.linked_manager.get_subordinates().count()
+        user = Tbluser.objects.create(
+            user_id="test.cached@test.com",
+            firstname="test",
+            lastname="case",
+            password="password",
+            user_type="RUSER",
+            market="BG",
+            process="AP",
+            start_date=datetime.datetime.today(),
+            breaklength="00:15:00",
+            shiftlength="07:45:00",
+            job_code="00F20G",
+            holiday_balance=20
+        )
+        auth = Tblauthorization.objects.get(admin=self.linked_manager)
+        auth.users.add(user)
+        self.assertEquals(self.linked_manager.get_subordinates().count(), count + 1)
+        auth.users.remove(user)
+        self.assertEquals(self.linked_manager.get_subordinates().count(), count)
+        # the same changes made from the user's side of the relation
+        user.subordinates.add(auth)
+        self.assertEquals(self.linked_manager.get_subordinates().count(), count + 1)
+        user.subordinates.clear()
+        self.assertEquals(self.linked_manager.get_subordinates().count(), count)
+
     def test_get_administrator_existing(self):
         self.assertEqual(self.linked_user.get_administrator(), self.linked_manager)
 
@@ -326,6 +359,45 @@ class UserTestCase(BaseUserTest):
         auth.users.add(user2)
         self.assertEquals(user, user2.get_administrator())
 
+    def test_get_cached_user(self):
+        self.assertEquals(get_cached_user(self.linked_user.id), self.linked_user)
+        user = Tbluser.objects.get(id=self.linked_user.id)
+        user.firstname = "cached"
+        user.save()
+        self.assertEquals(get_cached_user(self.linked_user.id).firstname, "cached")
+        user.firstname = "test"
+        user.save()
+        self.assertEquals(get_cached_user(self.linked_user.id).firstname, "test")
+
+    def test_get_cached_user_queryset_delete(self):
+        user = Tbluser.objects.create(
+            user_id="test.cachedelete@test.com",
+            firstname="test",
+            lastname="case",
+            password="password",
+            user_type="RUSER",
+            market="BG",
+            process="AP",
+            start_date=datetime.datetime.today(),
+            breaklength="00:15:00",
+            shiftlength="07:45:00",
+            job_code="00F20G",
+            holiday_balance=20
+        )
+        self.assertEquals(get_cached_user(user.id), user)
+        Tbluser.objects.filter(id=user.id).delete()
+        self.assertRaises(Tbluser.DoesNotExist, get_cached_user, user.id)
+
+    def test_get_cached_user_no_id(self):
+        self.assertRaises(Tbluser.DoesNotExist, get_cached_user, None)
+        self.assertRaises(Tbluser.DoesNotExist, get_cached_user, 31337)
+
+    def test_get_session_user(self):
+        request = self.linked_user_request
+        self.assertEquals(get_session_user(request), self.linked_user)
+        self.assertEquals(request.tt_user, self.linked_user)
+        del request.tt_user
+
     def testNonExistentUser404(self):
         class Req:
             session = {"user_id": 31337}
@@ -653,6 +725,44 @@ class TrackingEntryTestCase(BaseUserTest):
                     "error":"Start time after end time"
                     }), response.content)
 
+    def test_gen_calendar_cache_invalidated(self):
+        calendar = gen_calendar(1998, 3, 1, user=self.linked_user.id)
+        self.assertFalse("toggleChangeEntries" in calendar)
+        entry = TrackingEntry(
+            user=self.linked_user,
+            entry_date="1998-03-02",
+            start_time="09:00",
+            end_time="17:00",
+            breaks="00:15:00",
+            daytype="WKDAY"
+        )
+        entry.save()
+        calendar = gen_calendar(1998, 3, 1, user=self.linked_user.id)
+        self.assertTrue("toggleChangeEntries" in calendar)
+        entry.delete()
+        calendar = gen_calendar(1998, 3, 1, user=self.linked_user.id)
+        self.assertFalse("toggleChangeEntries" in calendar)
+
+    def test_total_balance_cache_invalidated(self):
+        balance = self.linked_user.get_total_balance(ret="flo",
+                                                     year=1998, month=4)
+        entry = TrackingEntry(
+            user=self.linked_user,
+            entry_date="1998-04-01",
+            start_time="09:00",
+            end_time="19:00",
+            breaks="00:15:00",
+            daytype="WKDAY"
+        )
+        entry.save()
+        self.assertNotEqual(
+            self.linked_user.get_total_balance(ret="flo", year=1998, month=4),
+            balance)
+        entry.delete()
+        self.assertEqual(
+            self.linked_user.get_total_balance(ret="flo", year=1998, month=4),
+            balance)
+
 class DatabaseTestCase(BaseUserTest):
     '''
     Class which tests the database for improper settings
@@ -747,6 +857,23 @@ class AjaxTestCase(BaseUserTest):
         json = simplejson.dumps({'success': True, 'error': ''})
         self.assertEquals(valid.content, json)
 
+    def testAddUserViaTeamLeaderUpdatesEmployeeBox(self):
+        '''
+        Tests that a user added by a team leader shows up in the team
+        leader's employee select box straight away
+        '''
+        invalidate_employee_box(self.linked_teamlead)
+        self.assertFalse("New Test" in
+                         generate_employee_box(self.linked_teamlead))
+
+        self.linked_teamlead_request.POST = self.new_user
+        valid = useredit(self.linked_teamlead_request)
+        json = simplejson.dumps({'success': True, 'error': ''})
+        self.assertEquals(valid.content, json)
+
+        self.assertTrue("New Test" in
+                        generate_employee_box(self.linked_teamlead))
+
     def testValidAddUserViaUnLinkedManager(self):
         '''
         Tests the ajax add user function for a hopefully valid add
@@ -1076,6 +1203,10 @@ class UtilitiesTest(TestCase):
 </select>'''
         self.assertEquals(output, string)
 
+    def testGenerateMonthBox(self):
+        self.assertEquals(generate_month_box(id="month"),
+                          generate_select(MONTH_MAP_SHORT, id="month"))
+
 class FrontEndTest(LiveServerTestCase):
     '''FrontEndTest uses Selenium to navigate the front-end of the
     application to test the Javascript and the interaction between
@@ -1307,6 +1438,15 @@ class FrontEndTestInMemory(BaseUserTest):
         response = self.client.get("/explain/")
         self.assertEquals(response.status_code, 200)
 
+    def test_ajax_form_not_found(self):
+        login_user(self, self.linked_user)
+        response = self.client.post("/ajax/", {'form_type': "no_such_form"},
+                                    HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEquals(response.content, simplejson.dumps({
+                    'success': False,
+                    'error': 'Form not found'
+                    }))
+
     def test_yearview_no_subs(self):
         login_user(self, self.linked_manager)
         response = self.client.get("/yearview/")
@@ -1873,6 +2013,26 @@ class EmailTest(BaseUserTest):
         forgot_pass(C())
         self.assertEqual(1, len(mail.outbox))
 
+    def test_send_password_reminder_frontend_smtp_failure(self):
+        from timetracker.tracker import models
+        def failing_send_mail(*args, **kwargs):
+            raise socket.error("Connection refused")
+        class C:
+            POST = {"email_input": self.linked_user.user_id}
+            session = {}
+            META = {}
+        password = Tbluser.objects.get(id=self.linked_user.id).password
+        models.send_mail = failing_send_mail
+        try:
+            response = forgot_pass(C())
+        finally:
+            models.send_mail = send_mail
+        self.assertTrue("could not be sent" in response.content)
+        self.assertEqual(0, len(mail.outbox))
+        self.assertEqual(
+            Tbluser.objects.get(id=self.linked_user.id).password, password
+            )
+
     def test_send_password_reminder_frontend_no_data(self):
         class C:
             POST = {}
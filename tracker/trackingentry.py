@@ -108,20 +108,42 @@ class TrackingEntry(models.Model):
         if self.daytype in ["DAYOD", "HOLIS"]:
             cache.delete(
                 "holidaytablerow%s%s" %
-                (self.user.id, self.entry_date.year)
+                (self.user_id, self.entry_date.year)
             )
         cache.delete("holidayfields:%s%s%s" % (
-            self.user.id, self.entry_date.year, self.entry_date.month)
+            self.user_id, self.entry_date.year, self.entry_date.month)
         )
         cache.delete("tracking_entries:%s%s%s" % (
-            self.user.id, self.entry_date.year, self.entry_date.month)
+            self.user_id, self.entry_date.year, self.entry_date.month)
         )
+        cache.delete("calendar:%s%s%s" % (
+            self.user_id, self.entry_date.year, self.entry_date.month)
+        )
+        self._invalidate_balances(self.user_id, self.entry_date)
+        if self.daytype == "LINKD":
+            # entries linking to this one show its date on their calendar
+            # and are left out of their user's balance.
+            for entry in self.linked_entry.all():
+                cache.delete("calendar:%s%s%s" % (
+                    entry.user_id, entry.entry_date.year, entry.entry_date.month)
+                )
+                self._invalidate_balances(entry.user_id, entry.entry_date)
         cache.delete("numdaytype:%s%s%s" % (
-            self.user.id, self.entry_date.year, self.daytype)
+            self.user_id, self.entry_date.year, self.daytype)
         )
-        cache.delete("holidaybalance:%s%s" % (self.user.id, self.entry_date.year))
-        cache.delete("yearview:%s%s" % (self.user.id, self.entry_date.year))
-        cache.delete("overtime_view:%s%s" % (self.user.id, self.entry_date.year))
+        cache.delete("holidaybalance:%s%s" % (self.user_id, self.entry_date.year))
+        cache.delete("yearview:%s%s" % (self.user_id, self.entry_date.year))
+        cache.delete("overtime_view:%s%s" % (self.user_id, self.entry_date.year))
+
+    @staticmethod
+    def _invalidate_balances(user_id, entry_date):
+        '''Removes the balances cached by
+        :meth:`Tbluser.get_total_balance` which cover the given date.'''
+        cache.delete_many([
+            "balance:%s%s%s" % (user_id, None, None),
+            "balance:%s%s%s" % (user_id, entry_date.year, None),
+            "balance:%s%s%s" % (user_id, entry_date.year, entry_date.month),
+            ])
 
     @staticmethod
     def headings():
@@ -161,7 +183,7 @@ class TrackingEntry(models.Model):
 
     def is_linked(self):
         '''Checks whether this particular entry is a linked entry.'''
-        return self.daytype == "LINKD" or self.link
+        return self.daytype == "LINKD" or self.link_id is not None
 
     def unlink(self):
         '''If this current entry is linked, then we will unlink the entry and
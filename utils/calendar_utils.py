@@ -51,13 +51,17 @@ from timetracker.utils.error_codes import DUPLICATE_ENTRY
 from timetracker.utils.datemaps import (MONTH_MAP, WEEK_MAP_SHORT,
                                         PROCESS_CHOICES,
                                         generate_select,
+                                        generate_month_box,
                                         generate_year_box, pad,
-                                        round_down)
+                                        round_down, invalidate_employee_box)
 from timetracker.utils.decorators import (admin_check, json_response,
                                           request_check)
 from timetracker.utils.error_codes import CONNECTION_REFUSED
 from timetracker.utils.crypto import get_random_string
 
+# the holiday page's process select box never changes, render it once.
+PROCESS_SELECT = generate_select((("ALL", "All"),) + PROCESS_CHOICES,
+                                 id="process_select")
 
 def get_request_data(form, request):
 
@@ -254,7 +258,7 @@ def gen_holiday_list(admin_user, year=None, month=None, process=None):
             if entry.comments:
                 comment_string = map(
                     unicode,
-                    [entry.entry_date, entry.user.name(), entry.comments]
+                    [entry.entry_date, user.name(), entry.comments]
                     )
                 comments_list.append(' '.join(comment_string))
 
@@ -323,19 +327,13 @@ def gen_holiday_list(admin_user, year=None, month=None, process=None):
         to_js(",\n" if idx+1 != len(user_list) else "")
     to_js("\n}")
 
-    # generate the data for the month select box
-    month_select_data = [(month_num + 1, month[1])
-                         for month_num, month in MONTH_MAP.items()]
-
     # generate the select box for the years
     year_select = generate_year_box(year, id="year_select")
     # generate the select box for the months
-    month_select = generate_select(month_select_data, id="month_select")
-    # generate the select box for the process type
-    process_select = "<td>%s</td>" \
-        % generate_select( (("ALL","All"),) + PROCESS_CHOICES,
-                           id="process_select") \
-                           if admin_user.user_type != "RUSER" else ""
+    month_select = generate_month_box(id="month_select")
+    # the select box for the process type
+    process_select = "<td>%s</td>" % PROCESS_SELECT \
+                     if admin_user.user_type != "RUSER" else ""
     # generate submit all button
     submit_all = '''<td>
                       <input id="submit_all" value="Submit All" type="button"
@@ -445,9 +443,14 @@ def gen_calendar(year=None, month=None, day=None, user=None):
     # django passes us Unicode strings
     year, month, day = int(year), int(month), int(day)
 
-    if month - 1 not in MONTH_MAP.keys(): # pragma: no cover
+    if not 0 < month <= len(MONTH_MAP): # pragma: no cover
         raise Http404
 
+    cachestr = "calendar:%s%s%s" % (user, year, month)
+    cached_result = cache.get(cachestr)
+    if cached_result:
+        return cached_result
+
     # if we've generated December, link to the next year
     if month + 1 == 13: # pragma: no cover
         next_url = '"/calendar/%s/%s"' % (year + 1, 1)
@@ -460,23 +463,17 @@ def gen_calendar(year=None, month=None, day=None, user=None):
     else:
         previous_url = '"/calendar/%s/%s"' % (year, month - 1)
 
-    # user_id came from sessions or the ajax call
-    # so this is pretty safe
-    database = Tbluser.objects.get(id__exact=user)
-
-    # pull out the entries for the given month
-    try:
-        database = TrackingEntry.objects.filter(
-            user=database.id,
+    # pull out the entries for the given month in one go and map them
+    # by day. user_id came from sessions or the ajax call so this is
+    # pretty safe.
+    entries = dict(
+        (entry.entry_date.day, entry)
+        for entry in TrackingEntry.objects.filter(
+            user_id=user,
             entry_date__year=year,
             entry_date__month=month
-            )
-
-    except TrackingEntry.DoesNotExist: # pragma: no cover
-        # it seems Django still follows through with the assignment
-        # when it raises an error, this is actually quite good because
-        # we can treat the query set like normal
-        pass
+            ).select_related("link")
+        )
 
     # create a semi-sparsely populated n-dimensional
     # array with the month's days per week
@@ -536,11 +533,10 @@ def gen_calendar(year=None, month=None, day=None, user=None):
             else:
                 emptyclass = 'empty'
 
-            # we've got the month in the query set,
-            # so just query that set for individual days
+            # we've got the month in memory,
+            # so just look up the individual days
             try:
-                # get all the data from our in-memory query-set.
-                data = database.get(entry_date__day=_day)
+                data = entries[_day]
 
                 # Pass these to the page so that the jQuery functions
                 # get the function arguments to edit those elements
@@ -568,7 +564,7 @@ def gen_calendar(year=None, month=None, day=None, user=None):
                            class="day-class {7}">{8}</td>\n""".format(*vals)
                        )
 
-            except TrackingEntry.DoesNotExist:
+            except KeyError:
 
                 # For clicking blank days to input the day quickly into the
                 # box. An alternative to the datepicker
@@ -599,7 +595,9 @@ def gen_calendar(year=None, month=None, day=None, user=None):
     to_cal("""\n</table>""")
 
     # join up the html and push it back
-    return ''.join(cal_html)
+    result = ''.join(cal_html)
+    cache.set(cachestr, result)
+    return result
 
 
 @request_check
@@ -756,7 +754,9 @@ def ajax_add_holiday(form):
         'error': '',
         'calendar': ''
     }
-    user = Tbluser.objects.get(id=form['user_id'])
+    user = Tbluser.objects.only(
+        "id", "shiftlength", "breaklength"
+        ).get(id=form['user_id'])
     shiftlength_list = user.get_shiftlength_list()
     holiday_req = TrackingEntry(
         user_id=user.id,
@@ -827,12 +827,11 @@ def ajax_delete_entry(request):
     }
 
     if form['hidden-id']:
-        # get the user and make sure that the user
-        # assigned to the TrackingEntry is the same
-        # as what's requesting the deletion
-        user = Tbluser.objects.get(id__exact=form['user_id'])
+        # make sure that the user assigned to the
+        # TrackingEntry is the same as what's
+        # requesting the deletion
         entry = TrackingEntry.objects.get(id=form['hidden-id'],
-                                          user=user)
+                                          user_id=form['user_id'])
         entry.delete()
 
     year, month, day = map(int,
@@ -925,8 +924,13 @@ def ajax_change_entry(request):
             # get the user and make sure that the user
             # assigned to the TrackingEntry is the same
             # as what's requesting the change
-            user = Tbluser.objects.get(id__exact=form['user_id'])
+            user = Tbluser.objects.only(
+                "id", "user_id"
+                ).get(id__exact=form['user_id'])
             entry = TrackingEntry.objects.get(id=form['hidden-id'])
+            # the entry may be moved to another date, drop the caches
+            # for the date it is leaving.
+            entry.invalidate_caches()
             entry.unlink()
             # change the fields on the retrieved entry
             stored_data = {
@@ -1113,7 +1117,13 @@ def delete_user(request):
     if user_id:
         try:
             user = Tbluser.objects.get(id=user_id)
+            # the user's own manager may not be the one deleting them,
+            # find them while the links still exist.
+            admin = user.get_administrator()
             user.delete()
+            for team_user in (admin, Tbluser.objects.get(id=logged_in_user)):
+                invalidate_employee_box(team_user)
+                team_user.invalidate_subordinates()
         except Tbluser.DoesNotExist:
             error_log.error("Tried to delete non-existant user")
             json_data['error'] = "User does not exist"
@@ -1330,6 +1340,9 @@ def useredit(request):
                 if key != 'password':
                     setattr(user, key, value)
             user.save()
+            # the edited user may be on another manager's team.
+            invalidate_employee_box(user)
+            user.invalidate_subordinates()
     except IntegrityError as error:
         if error[0] == DUPLICATE_ENTRY: # pragma: no cover
             database_log.info("Duplicate entry - %s" % str(error))
@@ -1342,6 +1355,8 @@ def useredit(request):
         error_log.error("Invalid data in creating a user")
         json_data['error'] = "Invalid Data."
         return json_data
+    invalidate_employee_box(auth_user)
+    auth_user.invalidate_subordinates()
     json_data['success'] = True
     return json_data
 
@@ -1418,6 +1433,8 @@ def mass_holidays(request):
 
     sick_sent = False
     for entry in holidays.items():
+        # the user's shift times are only looked up if we create an entry
+        time_str = None
         for (day, daytype) in enumerate(entry[1]):
             if day == 0:
                 continue
@@ -1453,9 +1470,10 @@ def mass_holidays(request):
             except TrackingEntry.DoesNotExist:
                 if daytype in ["empty", "LINKD"]:
                     continue
-                time_str = Tbluser.objects.get(
-                    id=entry[0]
-                    ).get_shiftlength_list()
+                if time_str is None:
+                    time_str = Tbluser.objects.only(
+                        "shiftlength", "breaklength"
+                        ).get(id=entry[0]).get_shiftlength_list()
                 new_entry = TrackingEntry(
                         entry_date=datestr,
                         user_id=entry[0],
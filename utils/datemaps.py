@@ -13,13 +13,9 @@ mid-length string for that value. For example:
 
 :attr:`WEEK_MAP_SHORT`: This is similar except using a longer string.
 
-:attr:`MONTH_MAP`: This is a map of the months which refer to a two-element
-tuple which has the short code for the month and the long string for that
-month. I.e. 'JAN' and 'January'.
-
-:attr:`MONTH_MAP`: This is a map of the months which refer to a two-element
-tuple which has the short code for the month and the long string for that
-month. I.e. 'JAN' and 'January'.
+:attr:`MONTH_MAP`: This is a tuple of the months, indexed from 0, where each
+month is a two-element tuple which has the short code for the month and the
+long string for that month. I.e. 'JAN' and 'January'.
 
 :attr:`MONTH_MAP_SHORT`: This is a map of the months which refer to the short
 name of a month corresponding to the number. I.e. 1: January.
@@ -58,20 +54,20 @@ WEEK_MAP_SHORT = {
     6: 'Su'
 }
 
-MONTH_MAP = {
-    0: ('JAN', 'January'),
-    1: ('FEB', 'February'),
-    2: ('MAR', 'March'),
-    3: ('APR', 'April'),
-    4: ('MAY', 'May'),
-    5: ('JUN', 'June'),
-    6: ('JUL', 'July'),
-    7: ('AUG', 'August'),
-    8: ('SEP', 'September'),
-    9: ('OCT', 'October'),
-    10: ('NOV', 'November'),
-    11: ('DEC', 'December')
-}
+MONTH_MAP = (
+    ('JAN', 'January'),
+    ('FEB', 'February'),
+    ('MAR', 'March'),
+    ('APR', 'April'),
+    ('MAY', 'May'),
+    ('JUN', 'June'),
+    ('JUL', 'July'),
+    ('AUG', 'August'),
+    ('SEP', 'September'),
+    ('OCT', 'October'),
+    ('NOV', 'November'),
+    ('DEC', 'December')
+)
 
 MONTH_MAP_SHORT = (
     (1, 'January'),
@@ -186,7 +182,7 @@ def generate_month_box(id=''):
 
     :param id: :class:`str` the id attribute to give to the element.
     '''
-    return generate_select(MONTH_MAP_SHORT, id)
+    return wrap_select(MONTH_OPTIONS, id)
 
 def generate_employee_box(admin_user, get_all=False):
     '''Generates a select box with all subordinates for a manager.
@@ -199,8 +195,14 @@ def generate_employee_box(admin_user, get_all=False):
     cached_result = cache.get("employee_box:%s%s" % (admin_user.id, get_all))
     if cached_result:
         return cached_result
-    ees = admin_user.get_subordinates(get_all=get_all)
-    ees_tuple = [(user.id, user.name()) for user in ees]
+    # only the id and name are rendered, so skip building model instances
+    # and read the columns straight out. This mirrors Tbluser.name().
+    ees_tuple = [
+        (userid, firstname + ' ' + lastname)
+        for userid, firstname, lastname in admin_user.get_subordinates(
+            get_all=get_all
+            ).values_list("id", "firstname", "lastname")
+        ]
     ees_tuple.append(("null", "----------"))
     select = generate_select(
         ees_tuple,
@@ -209,6 +211,21 @@ def generate_employee_box(admin_user, get_all=False):
     cache.set("employee_box:%s%s" % (admin_user.id, get_all), select)
     return select
 
+def invalidate_employee_box(admin_user):
+    '''Removes the cached select boxes generated by
+    :func:`generate_employee_box` for a manager's team. This should be called
+    whenever a member of the team is added, changed or removed.
+
+    Like :func:`generate_employee_box` the box is found through the user's
+    administrator, so any member of the team can be passed in.
+
+    :param admin_user: :class:`timetracker.tracker.models.Tbluser` an instance
+                       of the manager or any member of their team.
+    '''
+    admin_user = admin_user.get_administrator()
+    cache.delete_many(["employee_box:%s%s" % (admin_user.id, get_all)
+                       for get_all in (True, False)])
+
 def generate_select(data, id=''):
     """Generates a select box from a tuple of tuples
 
@@ -237,13 +254,30 @@ def generate_select(data, id=''):
 
     """
 
-    output = []
-    out = output.append
-    out('<select id="%s">\n' % id)
-    for option in data:
-        out('\t<option value="%s">%s</option>\n' % (option[0], option[1]))
-    out('</select>')
-    return ''.join(output)
+    return wrap_select(generate_options(data), id)
+
+def wrap_select(options, id=''):
+    """Wraps already rendered option elements in a select box, see
+    :func:`generate_select`.
+
+    :param options: :class:`str` the option elements.
+    :param id: :class:`str` the id attribute to give to the element.
+    :rtype: :class:`str`/HTML
+    """
+    return '<select id="%s">\n%s</select>' % (id, options)
+
+def generate_options(data):
+    """Generates just the option elements of a select box, see
+    :func:`generate_select`.
+
+    :param data: A tuple of two-element tuples, value and text.
+    :rtype: :class:`str`/HTML
+    """
+    return ''.join(['\t<option value="%s">%s</option>\n' % (value, text)
+                    for value, text in data])
+
+# The months never change so their options are rendered once, here.
+MONTH_OPTIONS = generate_options(MONTH_MAP_SHORT)
 
 
 def pad(string, padchr='0', amount=2):
@@ -9,6 +9,7 @@ from django.http import HttpResponse, Http404
 from django.conf import settings
 
 from timetracker.tracker.models import Tbluser
+from timetracker.utils.user_cache import get_session_user
 from timetracker.loggers import info_log, suspicious_log
 
 
@@ -19,7 +20,8 @@ def loggedin(func):
 
     This works by simply checking that the user_id in the session
     table is 1) There and 2) A real user. If either of these aren't
-    satisfied we throw back a 404.
+    satisfied we throw back a 404. The user found is kept on the request
+    as ``request.tt_user`` so the view doesn't need to look it up again.
 
     We also log this.
 
@@ -32,7 +34,7 @@ def loggedin(func):
     def inner(request, *args, **kwargs):
         '''implementation'''
         try:
-            Tbluser.objects.get(id=request.session.get("user_id"))
+            get_session_user(request)
         except Tbluser.DoesNotExist:
             info_log.info("Non-logged in user accessing @loggedin page")
             raise Http404
@@ -63,9 +65,7 @@ def permissions(permission):
             if settings.DEBUG: # pragma: no cover
                 return func(request, **kwargs)
             try:
-                user = Tbluser.objects.get(
-                    id=request.session.get('user_id', None)
-                )
+                user = get_session_user(request)
             except Tbluser.DoesNotExist:
                 info_log.info("Non-logged in user accessing @loggedin page")
                 raise Http404
@@ -0,0 +1,56 @@
+'''
+Module for retrieving :class:`timetracker.tracker.models.Tbluser` instances
+through the cache.
+
+Almost every page needs the logged in user, so rather than pulling the same
+row out of the database several times per request we keep a copy of it in
+the cache for a short while. :meth:`Tbluser.invalidate_caches` removes the
+copy whenever the user is saved or deleted.
+'''
+
+from django.core.cache import cache
+
+from timetracker.tracker.models import Tbluser
+
+# how long, in seconds, a user is kept in the cache.
+USER_CACHE_TIMEOUT = 300
+
+
+def get_cached_user(user_id):
+    '''Returns the :class:`Tbluser` with the given id, going to the database
+    only when the cache doesn't have it.
+
+    The returned instance may be slightly stale and should only be read
+    from, if you need to change and save a user then retrieve it from the
+    database.
+
+    :param user_id: The id of the user, usually taken from the session.
+    :returns: :class:`Tbluser`
+    :raises: :class:`Tbluser.DoesNotExist`
+    '''
+    if not user_id:
+        raise Tbluser.DoesNotExist
+    cachestr = "user:%s" % user_id
+    user = cache.get(cachestr)
+    if user is None:
+        user = Tbluser.objects.get(id=user_id)
+        cache.set(cachestr, user, USER_CACHE_TIMEOUT)
+    return user
+
+
+def get_session_user(request):
+    '''Returns the logged in :class:`Tbluser` for this request.
+
+    The user is kept on the request as ``request.tt_user`` after the first
+    lookup so that the decorators, the view and the context processor all
+    share the same instance.
+
+    :param request: :class:`HttpRequest`
+    :returns: :class:`Tbluser`
+    :raises: :class:`Tbluser.DoesNotExist`
+    '''
+    user = getattr(request, "tt_user", None)
+    if user is None:
+        user = get_cached_user(request.session.get("user_id"))
+        request.tt_user = user
+    return user
@@ -7,10 +7,11 @@
 '''
 
 import datetime
+import smtplib
+import socket
 
 from django.http import HttpResponse, Http404, HttpResponseRedirect
-from django.shortcuts import render_to_response
-from django.template import RequestContext
+from django.shortcuts import render
 from django.core.mail import send_mail
 from django.template.loader import get_template
 from django.template import Context
@@ -39,6 +40,7 @@ from timetracker.utils.datemaps import (generate_select,
                                         generate_year_box)
 
 from timetracker.utils.decorators import admin_check, loggedin
+from timetracker.utils.user_cache import get_session_user
 from timetracker.loggers import suspicious_log, email_log, error_log, debug_log
 
 
@@ -48,7 +50,7 @@ def user_context_manager(request):
     pieces of data so it's easier to push this work down to middleware
     '''
     try:
-        user = Tbluser.objects.get(id=request.session.get("user_id"))
+        user = get_session_user(request)
     except Tbluser.DoesNotExist:
         return {}
     return {
@@ -64,6 +66,10 @@ def user_context_manager(request):
         "approval_notifications": user.approval_notifications()
         }
 
+# the login form is unbound and never changes, so one instance is shared
+# between all the anonymous hits on the index page.
+LOGIN_FORM = Login()
+
 def index(request):
 
     """This function serves the base login page. This view detects if the
@@ -78,14 +84,10 @@ def index(request):
     """
 
     try:
-        user = Tbluser.objects.get(id=request.session.get("user_id"))
+        user = get_session_user(request)
     except Tbluser.DoesNotExist:
-        return render_to_response('index.html',
-                                  {'login': Login()},
-                                  RequestContext(request))
+        return render(request, 'index.html', {'login': LOGIN_FORM})
 
-    if request.session.get("user_id"):
-        user = Tbluser.objects.get(id=request.session.get("user_id"))
     if user.sup_tl_or_admin():
         return HttpResponseRedirect("/overtime/")
     if user.is_indeng():
@@ -119,7 +121,8 @@ def login(request):
         user = Tbluser.objects.get(user_id=user_id)
     # if the user doesn't match anything, notify
     except Tbluser.DoesNotExist: # pragma: no cover
-        return render_to_response(
+        return render(
+            request,
             "fail.html",
             {
                 "fail": "Login failure",
@@ -127,19 +130,18 @@ def login(request):
                 "helpfultext":"If you expect your account to be " + \
                               "active please contact your manager " + \
                               "or a site administrator."
-            },
-            RequestContext(request))
+            })
 
     if user.isdisabled():
-        return render_to_response(
+        return render(
+            request,
             "fail.html",
             {
                 "fail": "Login failure",
                 "reason":"Your account is disabled.",
                 "helpfultext":"You will need to request " + \
                               "re-activation from your manager."
-            },
-            RequestContext(request))
+            })
 
     if user.validate_password(request.POST['password']):
         # if all goes well, send to the tracker
@@ -150,15 +152,15 @@ def login(request):
         else:
             return HttpResponseRedirect("/calendar/")
     else:
-        return render_to_response(
+        return render(
+            request,
             "fail.html",
             {
                 "fail": "Login failure",
                 "reason":"Incorrect password",
                 "helpfultext":"You can receive a reminder <a href=\"/" + \
                               "forgot_my_password/\">here</a>"
-            },
-            RequestContext(request))
+            })
 
 def logout(request):
 
@@ -199,23 +201,24 @@ def user_view(request, year=None, month=None, day=None):
     :returns: A HttpResponse object which is passed to the browser.
 
     """
-    year = datetime.datetime.today().year if year is None else year
-    month = datetime.datetime.today().month if month is None else month
-    day = datetime.datetime.today().day if day is None else day
+    # django urls parse to unicode objects
+    today = datetime.date.today()
+    year = today.year if year is None else int(year)
+    month = today.month if month is None else int(month)
+    day = today.day if day is None else int(day)
 
     user_id = request.session['user_id']
     calendar_table = gen_calendar(year, month, day,
                                   user=user_id)
-    user_object = Tbluser.objects.get(id=user_id)
 
-    return render_to_response(
+    return render(
+        request,
         'calendar.html',
         {
          'calendar': calendar_table,
          'changeform': EntryForm(),
          'addform': AddForm(),
-        },
-        RequestContext(request)
+        }
     )
 
 @csrf_protect
@@ -224,7 +227,7 @@ def ajax(request):
     """Ajax request handler, dispatches to specific ajax functions
     depending on what json gets sent.
 
-    Any additional ajax views should be added to the ajax_funcs map,
+    Any additional ajax views should be added to the AJAX_FUNCS map,
     this will allow the dispatch function to be used. Future revisions
     could have a kind of decorator which could be applied to functions
     to mutate some global map of ajax dispatch functions. For now,
@@ -268,39 +271,19 @@ def ajax(request):
 
     """
 
-    # see which form we're dealing with and if it's in the POST
-    form_type = request.POST.get('form_type', None)
-
-    # if not, try the GET
-    if not form_type:
-        form_type = request.GET.get('form_type', None)
+    # see which form we're dealing with, the POST takes priority
+    form_type = (request.POST.get('form_type')
+                 or request.GET.get('form_type'))
 
     #if there isn't one, we'll send an error back
     if not form_type:
         return ajax_error("Missing Form")
 
-    # this could be mutated with a @register_ajax
-    # decorator or something
-    ajax_funcs = {
-        'add': ajax_add_entry,
-        'change': ajax_change_entry,
-        'delete': ajax_delete_entry,
-        'admin_get': gen_calendar,
-        'get_user_data': get_user_data,
-        'useredit': useredit,
-        'delete_user': delete_user,
-        'mass_holidays': mass_holidays,
-        'profileedit': profile_edit,
-        'get_comments': get_comments,
-        'add_comment': add_comment,
-        'remove_comment': remove_comment,
-        'tracking_data': get_tracking_entry_data,
-        'password_reminder': forgot_pass,
-    }
+    handler = AJAX_FUNCS.get(form_type)
+    if handler is None:
+        return ajax_error("Form not found")
     try:
-        return ajax_funcs.get(
-            form_type,ajax_error
-            )(request)
+        return handler(request)
     except Exception as e: # pragma: no cover
         error_log.error(str(e))
         raise
@@ -312,9 +295,7 @@ def view_with_employee_list(request, template=None, get_all=False): # pragma: no
     box and assign the regularly used template variables for these
     templates.
     '''
-    user = Tbluser.objects.get(
-        id=request.session.get("user_id", None)
-    )
+    user = get_session_user(request)
 
     try:
         ees = user.get_subordinates(get_all=get_all)
@@ -325,14 +306,14 @@ def view_with_employee_list(request, template=None, get_all=False): # pragma: no
                                 <option id="null">----------</option>
                               </select>"""
 
-    return render_to_response(
+    return render(
+        request,
         template,
         {
             "employees": ees,
             "user_form": UserForm(),
             "employee_option_list": employees_select
-        },
-        RequestContext(request)
+        }
     )
 
 @loggedin
@@ -350,16 +331,15 @@ def view_with_holiday_list(request,
     """
 
 
-    user = Tbluser.objects.get(id=request.session.get('user_id'))
+    user = get_session_user(request)
 
     if admin_required and not user.sup_tl_or_admin():
         raise Http404
 
-    year = datetime.datetime.today().year if year is None else year
-    month = datetime.datetime.today().month if month is None else month
-
     # django urls parse to unicode objects
-    year, month = int(year), int(month)
+    today = datetime.date.today()
+    year = today.year if year is None else int(year)
+    month = today.month if month is None else int(month)
 
     holiday_table, comments_list, js_calendar = gen_holiday_list(user,
                                                                  year,
@@ -371,7 +351,8 @@ def view_with_holiday_list(request,
     # of that. Being lazy.
     days_this_month = range(1, len(gen_datetime_cal(year, month))+1)
 
-    return render_to_response(
+    return render(
+        request,
         template,
         {
             'holiday_table': holiday_table,
@@ -379,8 +360,7 @@ def view_with_holiday_list(request,
             'days_this_month': days_this_month,
             'employee_select': generate_employee_box(user),
             'js_calendar': js_calendar,
-        },
-        RequestContext(request))
+        })
 
 @admin_check
 def yearview(request, who=None, year=None): # pragma: no cover
@@ -390,9 +370,7 @@ def yearview(request, who=None, year=None): # pragma: no cover
     :param who: This will be the ID of an employee which the yearview
     will be generated from if the employee is not within the span
     of control then a 404 will be generated.'''
-    auth_user = Tbluser.objects.get(
-        id=request.session.get('user_id')
-        )
+    auth_user = get_session_user(request)
 
     if not year:
         year = str(datetime.datetime.now().year)
@@ -416,17 +394,15 @@ def yearview(request, who=None, year=None): # pragma: no cover
     yeartable = yeartable.format(employees_select=generate_employee_box(auth_user),
                                  c="EMPTY",
                                  function="")
-    return render_to_response("yearview.html",
-                              {"yearview_table": yeartable,
-                               "year": year,
-                               "eeid": who,
-                               }, RequestContext(request))
+    return render(request, "yearview.html",
+                  {"yearview_table": yeartable,
+                   "year": year,
+                   "eeid": who,
+                   })
 
 @admin_check
 def overtime(request, who=None, year=None):
-    auth_user = Tbluser.objects.get(
-        id=request.session.get('user_id')
-        )
+    auth_user = get_session_user(request)
     if not year:
         year = str(datetime.datetime.now().year)
     if not who:
@@ -450,11 +426,11 @@ def overtime(request, who=None, year=None):
                                yearbox=generate_year_box(int(year), id="cmb_yearbox"),
                                c="EMPTY",
                                function="")
-    return render_to_response("overtime.html",
-                              {"ot_table": ot_table,
-                               "year": year,
-                               "eeid": who,
-                               }, RequestContext(request))
+    return render(request, "overtime.html",
+                  {"ot_table": ot_table,
+                   "year": year,
+                   "eeid": who,
+                   })
 
 @loggedin
 def edit_profile(request):
@@ -470,12 +446,11 @@ def edit_profile(request):
 
     """
 
-    user = Tbluser.objects.get(id=request.session.get("user_id"))
-    return render_to_response("editprofile.html",
-                              {'firstname': user.firstname,
-                               'lastname': user.lastname,
-                               },
-                              RequestContext(request))
+    user = get_session_user(request)
+    return render(request, "editprofile.html",
+                  {'firstname': user.firstname,
+                   'lastname': user.lastname,
+                   })
 
 
 @loggedin
@@ -497,8 +472,9 @@ def explain(request):
 
     """
 
-    user = Tbluser.objects.get(id=request.session.get("user_id"))
-    return render_to_response(
+    user = get_session_user(request)
+    return render(
+        request,
         "balance.html",
         {'firstname': user.firstname,
          'lastname': user.lastname,
@@ -507,8 +483,7 @@ def explain(request):
          'working_days': TrackingEntry.objects.filter(user=user.id).count(),
          'balances': user.balance_breakdown(),
          'holiday_balances': user.get_balances(datetime.datetime.now().year),
-         },
-        RequestContext(request))
+         })
 
 
 def forgot_pass(request):
@@ -537,9 +512,7 @@ def forgot_pass(request):
     # then we've got a non-post request
     email_recipient = request.POST.get("email_input", None)
     if not email_recipient:
-        return render_to_response("forgotpass.html",
-                                  {},
-                                  RequestContext(request))
+        return render(request, "forgotpass.html", {})
 
     try:
         try:
@@ -547,7 +520,8 @@ def forgot_pass(request):
         except ValueError:
             user = Tbluser.objects.get(user_id=email_recipient)
     except Tbluser.DoesNotExist:
-        return render_to_response(
+        return render(
+            request,
             "fail.html",
             {
                 "fail": "Login failure",
@@ -555,8 +529,39 @@ def forgot_pass(request):
                 "helpfultext":"If you expect your account to be " + \
                 "active please contact your manager " + \
                 "or a site administrator."
-            },
-            RequestContext(request))
-    user.set_random_password()
-    user.send_password_reminder()
+            })
+    try:
+        user.send_password_reminder()
+    # socket.error covers the SMTP server refusing the connection.
+    except (smtplib.SMTPException, socket.error) as error:
+        email_log.error("Password reminder for %s failed: %s" % (
+            user.user_id, str(error)))
+        return render(
+            request,
+            "fail.html",
+            {
+                "fail": "Password reminder failure",
+                "reason": "The reminder e-mail could not be sent.",
+                "helpfultext": "Please try again later or contact " + \
+                "a site administrator."
+            })
     return HttpResponseRedirect("/")
+
+# The ajax dispatch map, see :func:`ajax`. This could be mutated with a
+# @register_ajax decorator or something.
+AJAX_FUNCS = {
+    'add': ajax_add_entry,
+    'change': ajax_change_entry,
+    'delete': ajax_delete_entry,
+    'admin_get': gen_calendar,
+    'get_user_data': get_user_data,
+    'useredit': useredit,
+    'delete_user': delete_user,
+    'mass_holidays': mass_holidays,
+    'profileedit': profile_edit,
+    'get_comments': get_comments,
+    'add_comment': add_comment,
+    'remove_comment': remove_comment,
+    'tracking_data': get_tracking_entry_data,
+    'password_reminder': forgot_pass,
+}